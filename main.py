@@ -1,6 +1,6 @@
 import pickle
 
-from bgp_anomaly_detection import Paths, SnapShot, Machine
+from bgp_anomaly_detection import Paths, SnapShot, Machine, configure
 
 # 2906 / 53066 / 6939
 
@@ -18,4 +18,5 @@ def main():
 
 
 if __name__ == "__main__":
+    configure()
     main()
@@ -3,5 +3,18 @@ from .machine import Machine
 from .mrt_file import SnapShot
 from .paths import Paths, ensure_project_structure
 
-ensure_project_structure()
-Logger.setup_logging()
+
+def configure(*, ensure_dirs: bool = True, logging: bool = True) -> None:
+    """
+    Prepares the package for an application run. Importing the package has no side effects, so entry points call this
+    once at startup.
+
+    :param ensure_dirs: Create the project directories listed in Paths.
+    :param logging: Send log records to stdout through the root logger.
+    :return: None
+    """
+
+    if ensure_dirs:
+        ensure_project_structure()
+    if logging:
+        Logger.setup_logging()
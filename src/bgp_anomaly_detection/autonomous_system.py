@@ -1,6 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
+from functools import cache
 from inspect import getmembers, isdatadescriptor
-from ipaddress import ip_address, IPv4Address
+from sys import intern
 from typing import Self
 
 
@@ -13,14 +14,37 @@ class AS:
     path_sizes: frozenset[tuple[int, int]]
     announced_prefixes: frozenset[str]
     neighbours: frozenset[str]
+    _ipv6_count: int = field(init=False, repr=False, compare=False)
+    _mean_path_size: float = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
-        try:
-            id_ = int(self.id)
-        except ValueError:
-            raise ValueError(f"Invalid AS identifier: '{self.id}' is not a valid integer.")
-        else:
-            object.__setattr__(self, 'id', str(id_))
+        # Ids straight from the parsers are already canonical digit strings, only the rest needs normalising
+        if not (isinstance(self.id, str) and self.id.isascii() and self.id.isdigit() and self.id[0] != "0"):
+            try:
+                id_ = int(self.id)
+            except ValueError:
+                raise ValueError(f"Invalid AS identifier: '{self.id}' is not a valid integer.")
+            else:
+                object.__setattr__(self, 'id', intern(str(id_)))
+        self._derive()
+
+    def __setstate__(self, state: list) -> None:
+        # Pickles written before the derived slots existed only carry the declared fields, so rebuild what is missing
+        for as_field, value in zip(fields(self), state):
+            object.__setattr__(self, as_field.name, value)
+        if len(state) < len(fields(self)):
+            self._derive()
+
+    def _derive(self) -> None:
+        # Prefixes are only ever counted per family, so classify them once; IPv6 addresses always contain a colon
+        object.__setattr__(self, '_ipv6_count', sum(1 for prefix in self.announced_prefixes if ":" in prefix))
+
+        total_paths = 0
+        weighted_sum = 0
+        for size, count in self.path_sizes:
+            total_paths += count
+            weighted_sum += size * count
+        object.__setattr__(self, '_mean_path_size', weighted_sum / total_paths if total_paths else 0.0)
 
     def __str__(self) -> str:
         return (
@@ -45,25 +69,15 @@ class AS:
 
     @property
     def mean_path_size(self) -> float:
-        total_paths = sum(size_count[1] for size_count in self.path_sizes)
-        if total_paths == 0:
-            return 0.0
-        weighted_sum = sum(size * count for size, count in self.path_sizes)
-        return weighted_sum / total_paths
+        return self._mean_path_size
 
     @property
     def ipv4_count(self) -> int:
-        return sum(
-            1 for prefix in self.announced_prefixes
-            if isinstance(ip_address(prefix.split('/')[0]), IPv4Address)
-        )
+        return len(self.announced_prefixes) - self._ipv6_count
 
     @property
     def ipv6_count(self) -> int:
-        return sum(
-            1 for prefix in self.announced_prefixes
-            if not isinstance(ip_address(prefix.split('/')[0]), IPv4Address)
-        )
+        return self._ipv6_count
 
     @property
     def total_prefixes(self) -> int:
@@ -74,13 +88,14 @@ class AS:
         return len(self.neighbours)
 
     @classmethod
+    @cache
     def get_property_names(cls) -> tuple[str, ...]:
         return tuple(
             prty for prty, _ in getmembers(cls, isdatadescriptor)
-            if prty not in ("id", "announced_prefixes", "neighbours", "path_sizes")
+            if prty not in ("id", "announced_prefixes", "neighbours", "path_sizes") and not prty.startswith("_")
         )
 
-    def export_json(self) -> dict[str, str | int | float | tuple]:
+    def export_json(self) -> dict[str, str | int | float | frozenset]:
         return {
             "location": self.location,
             "times_seen": self.times_seen,
@@ -88,16 +103,16 @@ class AS:
                 "mid_path_count": self.mid_path_count,
                 "end_path_count": self.end_path_count,
                 "mean_path_size": self.mean_path_size,
-                "path_sizes": tuple(self.path_sizes)
+                "path_sizes": self.path_sizes
             },
             "prefix": {
                 "total_prefixes": self.total_prefixes,
                 "ipv4_count": self.ipv4_count,
                 "ipv6_count": self.ipv6_count,
-                "announced_prefixes": tuple(self.announced_prefixes)
+                "announced_prefixes": self.announced_prefixes
             },
             "neighbour": {
                 "total_neighbours": self.total_neighbours,
-                "neighbours": tuple(self.neighbours)
+                "neighbours": self.neighbours
             }
         }
@@ -1,4 +1,5 @@
 import pickle
+from functools import lru_cache
 
 from frozendict import frozendict
 from pycountry import countries
@@ -6,6 +7,7 @@ from pycountry import countries
 from .paths import Paths
 
 
+@lru_cache(maxsize=None)
 def get_country_name(abbreviation: str) -> str:
     try:
         country = countries.get(alpha_2=abbreviation.upper())
@@ -22,17 +24,18 @@ def make_location_dictionary() -> frozendict:
     location_dict = dict()
 
     for file_path in Paths.DELEG_DIR.rglob("*.txt"):
-        with open(file_path, "r") as file:
+        with open(file_path, "rb") as file:
             for line in file:
-                parts = line.strip().split('|')
-                if len(parts) >= 4 and parts[2] == "asn":
-                    as_id = parts[3]
-                    location_abbr = parts[1]
+                parts = line.rstrip().split(b'|', 4)
+                if len(parts) >= 4 and parts[2] == b"asn":
+                    as_id = parts[3].decode()
+                    location_abbr = parts[1].decode()
                     location_full = get_country_name(location_abbr)
                     location_dict[as_id] = location_full
 
     frozen_location_dict = frozendict(location_dict)
 
+    Paths.DELEG_DIR.mkdir(parents=True, exist_ok=True)
     with open(Paths.DELEG_DIR / "locale.pkl", "wb") as output:
         pickle.dump(frozen_location_dict, output)
 
@@ -6,7 +6,8 @@ class Logger:
     @staticmethod
     def setup_logging(level: int = INFO) -> None:
         """
-        Sets up the logging configuration.
+        Sets up the logging configuration. basicConfig leaves a root logger that already has handlers alone, so
+        repeated calls and logging set up by the calling application are kept.
         """
 
         basicConfig(
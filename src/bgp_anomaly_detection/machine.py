@@ -1,21 +1,61 @@
 from collections import Counter
-from copy import deepcopy
 from csv import writer
 from dataclasses import dataclass
 from pathlib import Path
-from pickle import dump
+from pickle import HIGHEST_PROTOCOL, dump
+from statistics import NormalDist
 from typing import Iterable
 
 import numpy as np
-from pandas import ExcelWriter, DataFrame
-from scipy.stats import skew, norm
 
 from .autonomous_system import AS
 from .logging import Logger
 from .mrt_file import SnapShot
+from .paths import Paths
 
 logger = Logger.get_logger(__name__)
 
+# z-scores outside these bounds fall in the 5% tails of the normal distribution, checked once instead of calling the cdf
+_Z_LOWER = NormalDist().inv_cdf(0.05)
+_Z_UPPER = NormalDist().inv_cdf(0.95)
+
+
+def _property_stats(history: np.ndarray) -> tuple[np.ndarray, ...]:
+    """
+    Computes the training statistics of a batch of property histories. Every row of the array is the history of one AS,
+    so all rows must have the same length.
+
+    :param history: 2-D array with one property history per row.
+    :return: Tuple with the range minimum, range maximum, mean, standard deviation, skewness and slope of each row.
+    """
+
+    # The range is the interquartile fence clipped to the observed values
+    st_qt, rd_qt = np.percentile(history, (25, 75), axis=1)
+    dq = rd_qt - st_qt
+    min_ = np.maximum(history.min(axis=1), st_qt - (1.5 * dq))
+    max_ = np.minimum(history.max(axis=1), rd_qt + (1.5 * dq))
+    mean = history.mean(axis=1)
+    # The central moments share one centered copy of the histories instead of each recomputing the mean
+    centered = history - mean[:, np.newaxis]
+    m2 = (centered ** 2).mean(axis=1)
+    std_d = np.sqrt(m2)
+
+    # Skewness and slope are left at zero for constant histories
+    skewness = np.zeros_like(mean)
+    slope = np.zeros_like(mean)
+    varying = std_d > 0
+    if varying.any():
+        m3 = (centered[varying] ** 3).mean(axis=1)
+        varying_m2 = m2[varying]
+        # Like scipy's biased skew, a variance lost to floating point precision gives nan
+        precision_loss = varying_m2 <= (np.finfo(np.float64).resolution * mean[varying]) ** 2
+        skewness[varying] = np.where(precision_loss, np.nan, m3 / varying_m2 ** 1.5)
+        # Least squares slope against the snapshot index, in closed form since the fit is only linear
+        x_centered = np.arange(history.shape[1]) - (history.shape[1] - 1) / 2
+        slope[varying] = centered[varying] @ x_centered / (x_centered @ x_centered)
+
+    return min_, max_, mean, std_d, skewness, slope
+
 
 class Machine:
     __slots__ = ["dataset", "train_data"]
@@ -33,34 +73,44 @@ class Machine:
         self.train_data = dict()
 
     @staticmethod
-    def _save_predictions(snapshot: SnapShot, predictions: dict):
+    def _save_predictions(snapshot: SnapShot, predictions: dict) -> None:
+        """
+        Saves the predictions of a snapshot as one CSV file per property, an AS warning level summary and a
+        spreadsheet with all of them.
+
+        :param snapshot: The snapshot the predictions were made for.
+        :param predictions: Predictions as returned by predict, ASes without training data map to None.
+        :return: None
+        """
+        # pandas is only needed for the spreadsheet export, keep it off the package import path
+        from pandas import ExcelWriter, DataFrame
 
         formatted_timestamp = snapshot.timestamp.strftime("%Y%m%d.%H%M")
+        # Claim the first free run directory for this snapshot, mkdir doubles as the existence check
         i = 1
         while True:
-            save_dir = Path("predict", formatted_timestamp + f"_{i:0>2}")
-            if not save_dir.exists():
+            save_dir = Paths.PRED_DIR / f"{formatted_timestamp}_{i:0>2}"
+            try:
+                save_dir.mkdir(parents=True)
                 break
-            i += 1
-        save_dir.mkdir()
+            except FileExistsError:
+                i += 1
 
         as_property_names = AS.get_property_names()
-        csv_data = {prty: list() for prty in as_property_names}
-        total_warning_level = list()
-
-        for as_id, as_predictions in predictions.items():
-            if as_predictions is None:
-                for property_name in as_property_names:
-                    csv_data[property_name].append((as_id, None, None))
-                continue
-            total_warning_level.append([as_id, int()])
-            for property_name, property_prediction in as_predictions.items():
-                csv_data[property_name].append((
-                    as_id,
-                    property_prediction["warning_level"],
-                    property_prediction["behaviour"]
-                ))
-                total_warning_level[-1][1] += property_prediction["warning_level"]
+
+        # Every row is read from the prediction of its own AS, ASes without training data get an empty row
+        csv_data = {
+            prty: [
+                (as_id, None, None) if as_predictions is None
+                else (as_id, as_predictions[prty]["warning_level"], as_predictions[prty]["behaviour"])
+                for as_id, as_predictions in predictions.items()
+            ]
+            for prty in as_property_names
+        }
+        total_warning_level = [
+            (as_id, sum(as_predictions[prty]["warning_level"] for prty in as_property_names))
+            for as_id, as_predictions in predictions.items() if as_predictions is not None
+        ]
 
         header1 = ("AS_ID", "Warning_Level")
         header2 = ("AS_ID", "Warning_Level", "Behaviour")
@@ -81,7 +131,7 @@ class Machine:
                 df = DataFrame(csv_data[property_name], columns=header2)
                 df.to_excel(exc_writer, sheet_name=property_name, index=False)
 
-        logger.info(f"Predictions saved in {save_dir}")
+        logger.info("Predictions saved in %s", save_dir)
 
     def train(self, snapshots: SnapShot | Iterable[SnapShot]) -> None:
         """
@@ -91,139 +141,122 @@ class Machine:
         :param snapshots: A single snapshot or iterable of snapshots containing AS instances to train the model.
         :return: None
         """
-        if not isinstance(snapshots, set):
+        if isinstance(snapshots, SnapShot):
+            snapshots = {snapshots}
+        elif not isinstance(snapshots, set):
             snapshots = set(snapshots)
         self.dataset = sorted(snapshots)
 
-        # Initialize dictionaries and templates for storing AS history and statistical properties
-        as_history = dict()
         as_property_names = AS.get_property_names()
-        as_history_template = {
-            prty: list() for prty in as_property_names
-        }
-        as_property_stats_template = {
-            prty: (
-                np.float64(), np.float64(), np.float64(),
-                np.float64(), np.float64(), np.float64(), str()
-            ) for prty in as_property_names
-        }
+        numeric_property_names = tuple(prty for prty in as_property_names if prty != "location")
 
-        logger.info(f"Starting training with {len(snapshots)} snapshots")
+        logger.info("Starting training with %s snapshots", len(snapshots))
+
+        # Every AS gets a row in the history arrays, in the order it is first seen
+        as_rows = dict()
+        for snapshot in self.dataset:
+            for as_id in snapshot.as_map:
+                as_rows.setdefault(as_id, len(as_rows))
+        as_ids = tuple(as_rows)
+
+        # Numeric histories are kept as one (AS, snapshot) array per property. Each AS history is packed to the left
+        # of its row, so the first history_lengths[row] columns hold the snapshots the AS appeared in
+        numeric_history = {
+            prty: np.empty((len(as_ids), len(self.dataset)), dtype=np.float64) for prty in numeric_property_names
+        }
+        history_lengths = np.zeros(len(as_ids), dtype=np.intp)
+        location_history = [list() for _ in as_ids]
+        announced_prefixes = [set() for _ in as_ids]
+        neighbours = [set() for _ in as_ids]
 
         for snapshot in self.dataset:
             # Update AS history for each AS in the snapshot
-            for as_id, as_instance in snapshot.as_map.items():
-                if as_id not in as_history:
-                    as_history[as_id] = {
-                        "history": deepcopy(as_history_template),
-                        "announced_prefixes": set(),
-                        "neighbours": set()
-                    }
-                # Update historical data for each AS property
-                for property_ in as_property_names:
-                    as_history[as_id]["history"][property_].append(getattr(as_instance, property_))
-                as_history[as_id]["announced_prefixes"].update(as_instance.announced_prefixes)
-                as_history[as_id]["neighbours"].update(as_instance.neighbours)
-
-        # Compute statistics for each AS based on its history
-        for as_id in as_history:
-            data = as_history[as_id]
+            as_instances = tuple(snapshot.as_map.values())
+            rows = np.fromiter((as_rows[as_id] for as_id in snapshot.as_map), dtype=np.intp, count=len(as_instances))
+            columns = history_lengths[rows]
+            history_lengths[rows] += 1
+            for property_ in numeric_property_names:
+                numeric_history[property_][rows, columns] = [
+                    getattr(as_instance, property_) for as_instance in as_instances
+                ]
+            for row, as_instance in zip(rows.tolist(), as_instances):
+                location_history[row].append(as_instance.location)
+                announced_prefixes[row].update(as_instance.announced_prefixes)
+                neighbours[row].update(as_instance.neighbours)
+
+        # Compute statistics for each AS based on its history. Numeric properties are batched further below
+        for row, as_id in enumerate(as_ids):
             self.train_data[as_id] = {
-                "stats": deepcopy(as_property_stats_template),
-                "announced_prefixes": as_history[as_id]["announced_prefixes"],
-                "neighbours": as_history[as_id]["neighbours"]
+                # Every property is assigned below, the keys are only laid out to keep the property order
+                "stats": dict.fromkeys(as_property_names),
+                # Training is the only writer, so the merged sets are frozen for lookups from here on
+                "announced_prefixes": frozenset(announced_prefixes[row]),
+                "neighbours": frozenset(neighbours[row])
             }
-            # Compute statistics for each property of the current AS
-            for prty in as_property_names:
-                prty_history = data["history"][prty]
-                if prty == "location":
-                    mode = Counter(prty_history).most_common(1)[0][0]
-                    self.train_data[as_id]["stats"][prty] = (
-                        np.float64(-1), np.float64(-1), np.float64(-1),
-                        np.float64(-1), np.float64(-1), np.float64(-1), mode
-                    )
-                    continue
-                elif prty == "path_sizes":
-                    counters = list()
-                    for counter in prty_history:
-                        for size, qnty in counter:
-                            counters.extend(size for _ in range(qnty))
-                    if counters:
-                        prty_history = counters
-                    else:
-                        self.train_data[as_id]["stats"][prty] = (
-                            np.float64(-1), np.float64(-1), np.float64(-1),
-                            np.float64(-1), np.float64(-1), np.float64(-1), str()
-                        )
-                        continue
-                # Compute range, mean, standard deviation, skewness, and slope for the current property data
-                st_qt = np.percentile(prty_history, 25)
-                rd_qt = np.percentile(prty_history, 75)
-                dq = rd_qt - st_qt
-                min_ = np.max((np.min(prty_history), st_qt - (1.5 * dq)))
-                max_ = np.min((np.max(prty_history), rd_qt + (1.5 * dq)))
-                mean = np.mean(prty_history)
-                std_d = np.std(prty_history)
-                if std_d > 0:
-                    skewness = skew(np.array(prty_history))
-                    slope, _ = np.polyfit(np.arange(len(prty_history)), prty_history, 1)
-                else:
-                    skewness = np.float64(0)
-                    slope = np.float64(0)
-                self.train_data[as_id]["stats"][prty] = (min_, max_, mean, std_d, skewness, slope, str())
-
-        logger.info(f"Finished training")
 
-    def predict(self, snapshot: SnapShot, save: bool = True) -> dict:
+            location_counts = Counter(location_history[row])
+            mode = max(location_counts, key=location_counts.__getitem__)
+            self.train_data[as_id]["stats"]["location"] = (
+                np.float64(-1), np.float64(-1), np.float64(-1),
+                np.float64(-1), np.float64(-1), np.float64(-1), mode
+            )
+
+        # Rows with the same history length are sliced out of the history arrays together, so each group of ASes goes
+        # through a handful of vectorized calls instead of one set of numpy calls per AS and property
+        for history_length in np.unique(history_lengths).tolist():
+            group_rows = np.flatnonzero(history_lengths == history_length)
+            group_ids = [as_ids[row] for row in group_rows.tolist()]
+            for prty in numeric_property_names:
+                stats = _property_stats(numeric_history[prty][group_rows, :history_length])
+                for as_id, min_, max_, mean, std_d, skewness, slope in zip(group_ids, *stats):
+                    self.train_data[as_id]["stats"][prty] = (min_, max_, mean, std_d, skewness, slope, str())
+
+        logger.info("Finished training")
 
-        predictions = dict()
+    def predict(self, snapshot: SnapShot, save: bool = True) -> dict:
 
         as_property_names = AS.get_property_names()
-        as_prediction_template = {
-            "warning_level": int(),
-            "behaviour": int()
-        }
-
-        logger.info(f"Starting prediction for snapshot: {snapshot}")
-
-        for as_id, as_instance in snapshot.as_map.items():
-            if as_id not in self.train_data:
-                predictions[as_id] = None
-                continue
+        threshold = 0.2
+
+        logger.info("Starting prediction for snapshot: %s", snapshot)
+
+        # ASes without training data keep a None prediction
+        predictions = dict.fromkeys(snapshot.as_map)
+        known_ids = [as_id for as_id in snapshot.as_map if as_id in self.train_data]
+        known_instances = [snapshot.as_map[as_id] for as_id in known_ids]
+        known_stats = [self.train_data[as_id]["stats"] for as_id in known_ids]
+        for as_id in known_ids:
+            predictions[as_id] = dict()
+
+        # Each property is classified for all known ASes at once, then scattered back into the per AS predictions
+        for prty in as_property_names:
+            if prty == "location":
+                warning_levels = [
+                    2 if as_instance.location != stats["location"][6] else 0
+                    for as_instance, stats in zip(known_instances, known_stats)
+                ]
+                behaviours = [0] * len(known_ids)
             else:
-                predictions[as_id] = {prty: deepcopy(as_prediction_template) for prty in as_property_names}
-
-            stats = self.train_data[as_id]["stats"]
-
-            for prty in as_property_names:
-                prty_predict = predictions[as_id][prty]
-                value_to_validate = getattr(as_instance, prty)
-                min_, max_, mean, std_d, skewness, slope, location = stats[prty]
-
-                if prty == "location":
-                    if value_to_validate != location:
-                        prty_predict["warning_level"] += 2
-                    continue
-
-                if value_to_validate < min_ or value_to_validate > max_:
-                    prty_predict["warning_level"] += 1
+                values = np.fromiter(
+                    (getattr(as_instance, prty) for as_instance in known_instances),
+                    dtype=np.float64, count=len(known_ids)
+                )
+                min_, max_, mean, std_d, _, slope = np.array(
+                    [stats[prty][:6] for stats in known_stats], dtype=np.float64
+                ).reshape(-1, 6).T
 
-                if std_d > 0:
-                    z_score = (value_to_validate - mean) / std_d
-                    probability = norm.cdf(z_score)
+                out_of_range = (values < min_) | (values > max_)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    z_score = (values - mean) / std_d
+                in_tails = (std_d > 0) & ((z_score < _Z_LOWER) | (z_score > _Z_UPPER))
 
-                    if probability < 0.05 or probability > 0.95:
-                        prty_predict["warning_level"] += 2
+                warning_levels = (out_of_range.astype(np.int64) + 2 * in_tails).tolist()
+                behaviours = ((slope > threshold).astype(np.int64) - (slope < -threshold)).tolist()
 
-                threshold = 0.2
-                if slope > threshold:
-                    prty_predict["behaviour"] = 1
-                elif slope < -threshold:
-                    prty_predict["behaviour"] = -1
-                else:
-                    prty_predict["behaviour"] = 0
+            for as_id, warning_level, behaviour in zip(known_ids, warning_levels, behaviours):
+                predictions[as_id][prty] = {"warning_level": warning_level, "behaviour": behaviour}
 
-        logger.info(f"Finished prediction")
+        logger.info("Finished prediction")
 
         if save:
             self._save_predictions(snapshot, predictions)
@@ -231,9 +264,9 @@ class Machine:
         return predictions
 
     def save(self, output_file: str | Path) -> None:
-        with open(output_file, 'wb') as file:
-            dump(self, file)
-        logger.info(f"Machine instance saved successfully at: {output_file}")
+        with open(output_file, 'wb', buffering=1 << 20) as file:
+            dump(self, file, protocol=HIGHEST_PROTOCOL)
+        logger.info("Machine instance saved successfully at: %s", output_file)
 
     # def plot_as_path_size(self, as_id: str | int) -> None:
     #     try:
@@ -241,11 +274,11 @@ class Machine:
     #     except KeyError:
     #         raise KeyError(f"Couldn't find any record of AS '{as_id}'")
     #
-    #     logger.info(f"Plotting path size distribution for {as_instance}")
+    #     logger.info("Plotting path size distribution for %s", as_instance)
     #
     #     save_path = analyse.plot_as_path_size(as_instance._id, as_instance._path_sizes)
     #
-    #     logger.info(f"Chart saved at {save_path}")
+    #     logger.info("Chart saved at %s", save_path)
     #
     # def plot_multiple_as_path_size(self, *as_ids: str | int) -> None:
     #     as_data = dict()
@@ -254,13 +287,13 @@ class Machine:
     #             as_instance = self.known_as[str(as_id)]
     #             as_data[as_instance._id] = as_instance._path_sizes
     #         else:
-    #             logger.info(f"Couldn't find any record of AS '{as_id}'")
+    #             logger.info("Couldn't find any record of AS '%s'", as_id)
     #
-    #     logger.info(f"Plotting path size distribution for {tuple(str(self.known_as[_as]) for _as in as_data)}")
+    #     logger.info("Plotting path size distribution for %s", tuple(str(self.known_as[_as]) for _as in as_data))
     #
     #     save_path = analyse.plot_multiple_as_path_sizes(as_data)
     #
-    #     logger.info(f"Chart saved at {save_path}")
+    #     logger.info("Chart saved at %s", save_path)
     #
     # def as_cdf(self, as_id: str | int) -> None:
     #     if isinstance(as_id, str) and not as_id.isnumeric():
@@ -269,10 +302,10 @@ class Machine:
     #     data = []
     #     as_instance = self.known_as[str(as_id)]
     #
-    #     logger.info(f"Plotting cdf")
+    #     logger.info("Plotting cdf")
     #
     #     save_path = analyse.cdf(data)
-    #     logger.info(f"Chart saved at {save_path}")
+    #     logger.info("Chart saved at %s", save_path)
 
 
 @dataclass(frozen=True, slots=True)
@@ -1,16 +1,19 @@
 from collections import OrderedDict, Counter
-from copy import copy
-from csv import DictWriter, DictReader, field_size_limit
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from json import dump as json_dump, load as json_load, loads, dumps
+from csv import DictReader, field_size_limit, writer
+from dataclasses import InitVar, dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from json import dumps
+from logging import INFO
 from math import inf
 from pathlib import Path
-from pickle import dump as pickle_dump, load as pickle_load
-from sys import maxsize
-from typing import Self
+from pickle import HIGHEST_PROTOCOL, dump as pickle_dump, load as pickle_load
+from sys import intern, maxsize
+from time import monotonic
+from typing import Iterator, Self, TextIO
 
 from frozendict import frozendict
+from orjson import OPT_INDENT_2, dumps as orjson_dumps, loads as orjson_loads
 from mrtparse import Reader, MRT_T, TD_V2_ST, BGP_ATTR_T, AS_PATH_SEG_T
 
 from .autonomous_system import AS
@@ -18,7 +21,18 @@ from .location import make_location_dictionary
 from .logging import Logger
 from .paths import Paths
 
-MESSAGES_AVG = 1154829  # Average number of messages in a snapshot .bz2 file
+# mrtparse constants compared on every message or path segment, bound once instead of looked up each time
+_TABLE_DUMP_V2 = MRT_T['TABLE_DUMP_V2']
+_PEER_INDEX_TABLE = TD_V2_ST['PEER_INDEX_TABLE']
+_AS_SET = AS_PATH_SEG_T['AS_SET']
+_AS_CONFED_SEQUENCE = AS_PATH_SEG_T['AS_CONFED_SEQUENCE']
+_AS_CONFED_SET = AS_PATH_SEG_T['AS_CONFED_SET']
+
+# TABLE_DUMP_V2 subtypes that carry RIB entries, checked with one set lookup per message
+_RIB_SUBTYPES = frozenset(
+    TD_V2_ST[subtype] for subtype in
+    ('RIB_IPV4_UNICAST', 'RIB_IPV4_MULTICAST', 'RIB_IPV6_UNICAST', 'RIB_IPV6_MULTICAST')
+)
 
 maxInt = maxsize
 while True:
@@ -30,6 +44,13 @@ while True:
 logger = Logger.get_logger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _parse_timestamp(date_time_str: str) -> datetime:
+    """Parse a 'YYYYmmddHHMM' snapshot timestamp, memoized since the same timestamps recur across loads."""
+
+    return datetime.strptime(date_time_str, "%Y%m%d%H%M")
+
+
 @dataclass(frozen=True, slots=True)
 class SnapShot:
     """
@@ -39,27 +60,30 @@ class SnapShot:
 
     The class parses BGP messages from the specified file, updating attributes such as snapshot time, AS paths,
     prefixes, and peer information. Parsed AS information can be exported to JSON, CSV, or pickled formats for
-    further analysis or archival purposes.
+    further analysis or archival purposes. When a .bz2 file is parsed, every route can also be written to the text
+    file given as dump_file, in bgpdump's one line format.
     """
 
     file_path: str
     timestamp: datetime = field(init=False)
     as_map: frozendict[str, AS] = field(init=False)
     msg_limit: int = field(default=inf)
+    # Only used while a .bz2 file is parsed, so it is not kept on the snapshot
+    dump_file: InitVar[str | Path | None] = None
 
-    def __post_init__(self):
+    def __post_init__(self, dump_file: str | Path | None):
         file_path = Path(self.file_path)
         file_extension = file_path.suffix.lower()
         base_name = file_path.stem.split(".")
         date_part, time_part = base_name[1], base_name[2]
         date_time_str = date_part + time_part
-        timestamp = datetime.strptime(date_time_str, "%Y%m%d%H%M")
+        timestamp = _parse_timestamp(date_time_str)
 
         object.__setattr__(self, "timestamp", timestamp)
 
         parser = MRTParser()
         if file_extension == ".bz2":
-            as_map = parser.import_bz2(self.file_path, self.msg_limit)
+            as_map = parser.import_bz2(self.file_path, self.msg_limit, dump_file)
         elif file_extension == ".csv":
             as_map = parser.import_csv(self.file_path)
         elif file_extension == ".json":
@@ -82,6 +106,11 @@ class SnapShot:
         else:
             return NotImplemented
 
+    def __hash__(self) -> int:
+        """Hash on the snapshot time, consistent with equality, instead of hashing every parsed AS."""
+
+        return hash(self.timestamp)
+
     def __lt__(self, other: Self) -> bool:
         """Compare if this SnapShot instance is less than another based on their snapshot times."""
 
@@ -125,38 +154,11 @@ class SnapShot:
         destination_dir = Path(destination_dir)
         destination_dir.mkdir(exist_ok=True, parents=True)
 
-        logger.info(f"Exporting data to CSV")
-
-        csv_data = list()
-        for as_id, as_instance in self.as_map.items():
-            if as_instance.path_sizes:
-                path_sizes = dumps({length: qnty for length, qnty in as_instance.path_sizes})
-            else:
-                path_sizes = None
-            if as_instance.announced_prefixes:
-                announced_prefixes = ";".join(as_instance.announced_prefixes)
-            else:
-                announced_prefixes = None
-            if as_instance.neighbours:
-                neighbours = ";".join(as_instance.neighbours)
-            else:
-                neighbours = None
-
-            csv_data.append(
-                {
-                    "as_id": as_id,
-                    "location": as_instance.location,
-                    "mid_path_count": as_instance.mid_path_count,
-                    "end_path_count": as_instance.end_path_count,
-                    "path_sizes": path_sizes,
-                    "announced_prefixes": announced_prefixes,
-                    "neighbours": neighbours
-                }
-            )
+        logger.info("Exporting data to CSV")
 
         csv_file_path = destination_dir / (Path(self.file_path).stem + ".csv")
-        with open(csv_file_path, mode="w", newline="") as csv_file:
-            fieldnames = [
+        with open(csv_file_path, mode="w", newline="", buffering=1 << 20) as csv_file:
+            fieldnames = (
                 "as_id",
                 "location",
                 "mid_path_count",
@@ -164,12 +166,31 @@ class SnapShot:
                 "path_sizes",
                 "announced_prefixes",
                 "neighbours"
-            ]
-            writer = DictWriter(csv_file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(csv_data)
+            )
+            writer_ = writer(csv_file)
+            writer_.writerow(fieldnames)
+            writer_.writerows(self._csv_rows())
+
+        logger.info("Parsed data saved at: %s", csv_file_path)
+
+    def _csv_rows(self) -> Iterator[tuple]:
+        """
+        Yield one CSV row per AS, in the column order written by export_csv.
+
+        :return: Iterator of row tuples.
+        """
 
-        logger.info(f"Parsed data saved at: {csv_file_path}")
+        # csv.writer already writes an empty join and None alike, only path sizes need a placeholder for no data
+        for as_id, as_instance in self.as_map.items():
+            yield (
+                as_id,
+                as_instance.location,
+                as_instance.mid_path_count,
+                as_instance.end_path_count,
+                dumps(dict(as_instance.path_sizes)) if as_instance.path_sizes else None,
+                ";".join(as_instance.announced_prefixes),
+                ";".join(as_instance.neighbours)
+            )
 
     def export_json(self, destination_dir: str = Paths.PARSED_DIR) -> None:
         """
@@ -182,27 +203,27 @@ class SnapShot:
         destination_dir = Path(destination_dir)
         destination_dir.mkdir(exist_ok=True, parents=True)
 
-        logger.info(f"Exporting data to JSON")
+        logger.info("Exporting data to JSON")
 
         formatted_date_time = self.timestamp.strftime('%d/%m/%Y %H:%M')
 
-        as_info = dict()
-        for as_id in self.as_map:
-            as_info[as_id] = self.as_map[as_id].export_json()
-
-        output_data = {
-            "snapshot_time": formatted_date_time,
-            "as": {
-                "as_total": len(self.as_map),
-                "as_info": as_info
-            }
-        }
-
         json_file_path = destination_dir / (Path(self.file_path).stem + ".json")
-        with open(json_file_path, "w") as output:
-            json_dump(output_data, output, indent=4)
+        with open(json_file_path, "wb", buffering=1 << 20) as output:
+            # The document is streamed one AS at a time instead of building a dict of every AS first. Each entry is
+            # encoded on its own and shifted to its nesting depth, which gives the same bytes as a whole document dump
+            output.write(
+                b'{\n  "snapshot_time": %b,\n  "as": {\n    "as_total": %d,\n    "as_info": {'
+                % (orjson_dumps(formatted_date_time), len(self.as_map))
+            )
+            separator = b"\n      "
+            for as_id, as_instance in self.as_map.items():
+                # AS.export_json hands back its frozensets as-is, they are encoded as JSON arrays here
+                as_entry = orjson_dumps(as_instance.export_json(), default=list, option=OPT_INDENT_2)
+                output.write(b"%b%b: %b" % (separator, orjson_dumps(as_id), as_entry.replace(b"\n", b"\n      ")))
+                separator = b",\n      "
+            output.write(b"\n    }\n  }\n}" if self.as_map else b"}\n  }\n}")
 
-        logger.info(f"Parsed data saved at: {json_file_path}")
+        logger.info("Parsed data saved at: %s", json_file_path)
 
     def export_pickle(self, destination_dir: str = Paths.PARSED_DIR):
         """
@@ -215,16 +236,13 @@ class SnapShot:
         destination_dir = Path(destination_dir)
         destination_dir.mkdir(exist_ok=True, parents=True)
 
-        logger.info(f"Exporting snapshot to pickle file")
+        logger.info("Exporting snapshot to pickle file")
 
         save_path = destination_dir / (Path(self.file_path).stem + ".pkl")
-        with open(save_path, "wb") as file:
-            pickle_dump(self, file)
-
-        logger.info(f"SnapShot instance saved successfully at: {save_path}")
-
+        with open(save_path, "wb", buffering=1 << 20) as file:
+            pickle_dump(self, file, protocol=HIGHEST_PROTOCOL)
 
-peer = None
+        logger.info("SnapShot instance saved successfully at: %s", save_path)
 
 
 class MRTParser:
@@ -234,6 +252,7 @@ class MRTParser:
         self._as_map: dict[str, dict[str, int | str | Counter | set]] = dict()
         self._type = str()
         self._flag = str()
+        self._peer: list[dict] = list()
         self._peer_ip = str()
         self._ts = int()
         self._peer_as = int()
@@ -242,6 +261,7 @@ class MRTParser:
         self._as_path = list()
         self._next_hop = list()
         self._as4_path = list()
+        self._dump_output: TextIO | None = None
 
         self.location_map: frozendict[str, str]
         if not (Paths.DELEG_DIR / "locale.pkl").exists():
@@ -250,55 +270,78 @@ class MRTParser:
             with open(Paths.DELEG_DIR / "locale.pkl", "rb") as file:
                 self.location_map = pickle_load(file)
 
-    def import_bz2(self, file_path: str, msg_limit: int) -> frozendict:
+    def import_bz2(self, file_path: str, msg_limit: int, dump_file: str | Path | None = None) -> frozendict:
         """
         Import AS data from a .bz2 compressed BGP data file.
 
         :param file_path: Path to the .bz2 file.
         :param msg_limit: Maximum number of messages to process.
+        :param dump_file: Optional text file where every parsed route is also written, in bgpdump's one line format.
         :return: Frozen dictionary containing AS data.
         """
 
         reader = Reader(str(file_path))
-        start_time = datetime.now()
+        start_time = monotonic()
+
+        logger.info("Reading file: %s", file_path)
+
+        # The dump file is opened once for the whole read, every route line goes through the same 1 MiB buffer
+        if dump_file is not None:
+            self._dump_output = open(dump_file, "w", buffering=1 << 20)
+        try:
+            self._read_messages(reader, msg_limit, start_time)
+        finally:
+            if self._dump_output is not None:
+                self._dump_output.close()
+                self._dump_output = None
 
-        logger.info(f"Reading file: {file_path}")
+        return self._freeze_map()
+
+    def _read_messages(self, reader: Reader, msg_limit: int, start_time: float) -> None:
+        """
+        Parse the messages of an MRT reader into the internal AS map.
+
+        :param reader: MRT reader positioned at the first message.
+        :param msg_limit: Maximum number of messages to process.
+        :param start_time: Monotonic clock reading from when the import started, used for progress estimates.
+        :return: None
+        """
 
         msg_count = 0
         for m in reader:
             if m.err:
                 continue
 
-            self._nlri = list()
-            t = list(m.data['type'])[0]
-            if t == MRT_T['TABLE_DUMP_V2']:
+            self._nlri.clear()
+            t = next(iter(m.data['type']))
+            if t == _TABLE_DUMP_V2:
                 self._td_v2(m.data)
             else:
-                print(f"This MRT Format {t} is not supported.")
+                logger.warning("MRT format %s is not supported", t)
 
             msg_count += 1
             if msg_count >= msg_limit:
                 break
-            if msg_count % 100000 == 0:
-                elapsed_time = datetime.now() - start_time
-                elapsed_seconds = elapsed_time.total_seconds()
-                messages_per_second = msg_count / elapsed_seconds
-                messages_left = MESSAGES_AVG - msg_count
-                estimated_seconds_left = messages_left / messages_per_second
-
-                estimated_time_left = timedelta(seconds=estimated_seconds_left)
-                estimated_minutes = estimated_time_left.seconds // 60
-                estimated_seconds = estimated_time_left.seconds % 60
-
-                logger.info(
-                    f"{msg_count} messages processed... Estimated time left: {estimated_minutes}:{estimated_seconds:02}"
-                )
-
-        elapsed_time = datetime.now() - start_time
-        elapsed_time_formatted = str(elapsed_time).split('.')[0]
-        logger.info(f"Messages Total: {msg_count} | Total time elapsed: {elapsed_time_formatted}")
-
-        return self._freeze_map()
+            if msg_count % 100000 == 0 and logger.isEnabledFor(INFO):
+                messages_per_second = msg_count / (monotonic() - start_time)
+                # The message count of a file is unknown up front, only a finite limit gives a real target to estimate
+                if msg_limit == inf:
+                    logger.info("%s messages processed... (%.0f msg/s)", msg_count, messages_per_second)
+                else:
+                    estimated_minutes, estimated_seconds = divmod(
+                        int((msg_limit - msg_count) / messages_per_second), 60
+                    )
+                    logger.info(
+                        "%s messages processed... (%.0f msg/s) Estimated time left: %s:%02d",
+                        msg_count, messages_per_second, estimated_minutes, estimated_seconds
+                    )
+
+        elapsed_minutes, elapsed_seconds = divmod(int(monotonic() - start_time), 60)
+        elapsed_hours, elapsed_minutes = divmod(elapsed_minutes, 60)
+        logger.info(
+            "Messages Total: %s | Total time elapsed: %s:%02d:%02d",
+            msg_count, elapsed_hours, elapsed_minutes, elapsed_seconds
+        )
 
     @staticmethod
     def import_csv(file_path: str) -> frozendict:
@@ -311,17 +354,17 @@ class MRTParser:
 
         as_map: dict[str, AS] = dict()
 
-        logger.info(f"Importing data from CSV file: {file_path}")
+        logger.info("Importing data from CSV file: %s", file_path)
 
         with open(file_path, mode='r') as csv_file:
             reader = DictReader(csv_file)
             row: OrderedDict
             for row in reader:
-                as_id = row["as_id"]
+                as_id = intern(row["as_id"])
                 location = row["location"]
                 mid_path_count = int(row["mid_path_count"])
                 end_path_count = int(row["end_path_count"])
-                path_sizes_dict = loads(row["path_sizes"]) if row["path_sizes"] else dict()
+                path_sizes_dict = orjson_loads(row["path_sizes"]) if row["path_sizes"] else dict()
                 path_sizes = frozenset((int(length), qnty) for length, qnty in path_sizes_dict.items())
                 announced_prefixes_raw = row["announced_prefixes"]
                 if announced_prefixes_raw:
@@ -330,7 +373,7 @@ class MRTParser:
                     announced_prefixes = frozenset()
                 neighbours_raw = row["neighbours"]
                 if neighbours_raw:
-                    neighbours = frozenset(neighbours_raw.split(";"))
+                    neighbours = frozenset(map(intern, neighbours_raw.split(";")))
                 else:
                     neighbours = frozenset()
 
@@ -352,27 +395,26 @@ class MRTParser:
 
         as_map: dict[str, AS] = dict()
 
-        with open(file_path, "r") as input_file:
-            input_data = json_load(input_file)
+        with open(file_path, "rb") as input_file:
+            input_data = orjson_loads(input_file.read())
 
-        logger.info(f"Importing data from JSON file: {file_path}")
+        logger.info("Importing data from JSON file: %s", file_path)
 
         for as_id, as_data in input_data["as"]["as_info"].items():
+            as_id = intern(as_id)
             location = as_data["location"]
-            mid_path_count = int(as_data["path"]["mid_path_count"])
-            end_path_count = int(as_data["path"]["end_path_count"])
-            path_sizes_raw = as_data["path"]["path_sizes"]
-            path_sizes = frozenset((length, qnty) for length, qnty in path_sizes_raw)
-            announced_prefixes_raw = as_data["prefix"]["announced_prefixes"]
-            announced_prefixes = frozenset(announced_prefixes_raw)
-            neighbours_raw = as_data["neighbour"]["neighbours"]
-            neighbours = frozenset(neighbours_raw)
+            path_data = as_data["path"]
+            mid_path_count = path_data["mid_path_count"]
+            end_path_count = path_data["end_path_count"]
+            path_sizes = frozenset(map(tuple, path_data["path_sizes"]))
+            announced_prefixes = frozenset(as_data["prefix"]["announced_prefixes"])
+            neighbours = frozenset(map(intern, as_data["neighbour"]["neighbours"]))
 
             as_map[as_id] = AS(
                 as_id, location, mid_path_count, end_path_count, path_sizes, announced_prefixes, neighbours
             )
 
-        logger.info(f"JSON data imported successfully")
+        logger.info("JSON data imported successfully")
 
         return frozendict(as_map)
 
@@ -423,63 +465,58 @@ class MRTParser:
         :return: None
         """
 
-        path = self._merge_as_path().split()
-        valid_path = list()
-        for as_id in path:
-            if as_id in self._as_map:
-                valid_path.append(as_id)
-                continue
-            if as_id.startswith("{"):  # Caso o AS esteja entre {}, ele é ignorado
-                valid_path.append(None)
-                continue
-            valid_path.append(as_id)
-            self._as_map[as_id] = {
-                "location": self.get_location(as_id),
-                "mid_path_count": int(),
-                "end_path_count": int(),
-                "path_sizes": Counter(),
-                "announced_prefixes": set(),
-                "neighbours": set(),
-            }
-        path = valid_path
-        path_len = len(path)
+        as_map = self._as_map
+        path = self._merge_as_path()
+        last = len(path) - 1
 
+        # Single pass over the path, every AS is linked to the one before it instead of looking ahead
+        previous_id = previous_data = None
         for i, as_id in enumerate(path):
-            if as_id is None:
+            if as_id.startswith("{"):  # Caso o AS esteja entre {}, ele é ignorado
+                previous_id = previous_data = None
                 continue
+            # Every occurrence of an AS id shares one string object, so map keys and neighbour sets hold no copies
+            as_id = intern(as_id)
+            as_data = as_map.get(as_id)
+            if as_data is None:
+                as_data = as_map[as_id] = {
+                    "location": self.get_location(as_id),
+                    "mid_path_count": int(),
+                    "end_path_count": int(),
+                    "path_sizes": Counter(),
+                    "announced_prefixes": set(),
+                    "neighbours": set(),
+                }
 
-            if i < path_len - 1:
-                next_as_id = path[i + 1]
-                if next_as_id is not None:
-                    self._as_map[as_id]["neighbours"].add(next_as_id)
-                    self._as_map[next_as_id]["neighbours"].add(as_id)
-            if i == 0 or i == path_len - 1:
-                self._as_map[as_id]["end_path_count"] += 1
+            if previous_data is not None:
+                previous_data["neighbours"].add(as_id)
+                as_data["neighbours"].add(previous_id)
+            if i == 0 or i == last:
+                as_data["end_path_count"] += 1
             else:
-                self._as_map[as_id]["mid_path_count"] += 1
+                as_data["mid_path_count"] += 1
+            previous_id, previous_data = as_id, as_data
 
-        origin_as_id = path[-1]
-        if origin_as_id is not None:
-            self._as_map[origin_as_id]["path_sizes"][path_len - 1] += 1
-            self._as_map[origin_as_id]["announced_prefixes"].add(prefix)
+        # After the loop the previous AS is the origin, unless the path ends in an AS set
+        if previous_data is not None:
+            previous_data["path_sizes"][last] += 1
+            previous_data["announced_prefixes"].add(prefix)
 
-    def _export_line(self, prefix) -> None:
+    def _export_line(self, prefix: str) -> None:
         """
-        Write a single line of parsed data to a text file.
+        Write a single line of parsed data to the dump file.
 
         :param prefix: The prefix being announced or withdrawn.
         :return: None
         """
 
-        # TODO: optional dump to text while reading .bz2 file
-        with open(Paths.DUMP_DIR / "dump.txt", "a") as output:
-            if self._flag == 'B' or self._flag == 'A':
-                output.write('%s|%s|%s|%s|%s|%s|%s' % (
-                    self._type, self._ts, self._flag, self._peer_ip, self._peer_as, prefix, self._merge_as_path()))
-                output.write('\n')
-            elif self._flag == 'W':
-                output.write(
-                    '%s|%s|%s|%s|%s|%s\n' % (self._type, self._ts, self._flag, self._peer_ip, self._peer_as, prefix))
+        if self._flag == 'B' or self._flag == 'A':
+            as_path = ' '.join(self._merge_as_path())
+            self._dump_output.write('%s|%s|%s|%s|%s|%s|%s\n' % (
+                self._type, self._ts, self._flag, self._peer_ip, self._peer_as, prefix, as_path))
+        elif self._flag == 'W':
+            self._dump_output.write(
+                '%s|%s|%s|%s|%s|%s\n' % (self._type, self._ts, self._flag, self._peer_ip, self._peer_as, prefix))
 
     def _parse_routes(self) -> None:
         """
@@ -491,11 +528,16 @@ class MRTParser:
         for withdrawn in self._withdrawn:
             if self._type == 'BGP4MP':
                 self._flag = 'W'
+                if self._dump_output is not None:
+                    self._export_line(withdrawn)
                 self._parse_data(withdrawn)
         for nlri in self._nlri:
             if self._type == 'BGP4MP':
                 self._flag = 'A'
-            for _ in self._next_hop:
+            # A route is counted once, however many next hops it carries (e.g. global plus link-local IPv6)
+            if self._next_hop:
+                if self._dump_output is not None:
+                    self._export_line(nlri)
                 self._parse_data(nlri)
 
     def _td_v2(self, m) -> None:
@@ -506,27 +548,24 @@ class MRTParser:
         :return: None
         """
 
-        global peer
         self._type = 'TABLE_DUMP2'
         self._flag = 'B'
-        self._ts = list(m['timestamp'])[0]
-        st = list(m['subtype'])[0]
-        if st == TD_V2_ST['PEER_INDEX_TABLE']:
-            peer = copy(m['peer_entries'])
-        elif (
-                st == TD_V2_ST['RIB_IPV4_UNICAST'] or
-                st == TD_V2_ST['RIB_IPV4_MULTICAST'] or
-                st == TD_V2_ST['RIB_IPV6_UNICAST'] or
-                st == TD_V2_ST['RIB_IPV6_MULTICAST']
-        ):
-            self._nlri.append('%s/%d' % (m['prefix'], m['length']))
+        self._ts = next(iter(m['timestamp']))
+        st = next(iter(m['subtype']))
+        if st == _PEER_INDEX_TABLE:
+            # The decoded table is only read from, so it is kept as is instead of copied
+            self._peer = m['peer_entries']
+        elif st in _RIB_SUBTYPES:
+            self._nlri.append(f"{m['prefix']}/{m['length']}")
+            peer_table = self._peer
             for entry in m['rib_entries']:
 
-                self._peer_ip = peer[entry['peer_index']]['peer_ip']
-                self._peer_as = peer[entry['peer_index']]['peer_as']
-                self._as_path = []
-                self._next_hop = []
-                self._as4_path = []
+                peer_entry = peer_table[entry['peer_index']]
+                self._peer_ip = peer_entry['peer_ip']
+                self._peer_as = peer_entry['peer_as']
+                self._as_path.clear()
+                self._next_hop.clear()
+                self._as4_path.clear()
                 for attr in entry['path_attributes']:
                     self._bgp_attr(attr)
                 self._parse_routes()
@@ -539,58 +578,112 @@ class MRTParser:
         :return: None
         """
 
-        attr_t = list(attr['type'])[0]
-        if attr_t == BGP_ATTR_T['NEXT_HOP']:
-            self._next_hop.append(attr['value'])
-        elif attr_t == BGP_ATTR_T['AS_PATH']:
-            self._as_path = []
-            for seg in attr['value']:
-                seg_t = list(seg['type'])[0]
-                if seg_t == AS_PATH_SEG_T['AS_SET']:
-                    self._as_path.append('{%s}' % ','.join(seg['value']))
-                elif seg_t == AS_PATH_SEG_T['AS_CONFED_SEQUENCE']:
-                    self._as_path.append('(' + seg['value'][0])
-                    self._as_path += seg['value'][1:-1]
-                    self._as_path.append(seg['value'][-1] + ')')
-                elif seg_t == AS_PATH_SEG_T['AS_CONFED_SET']:
-                    self._as_path.append('[%s]' % ','.join(seg['value']))
-                else:
-                    self._as_path += seg['value']
-        elif attr_t == BGP_ATTR_T['MP_REACH_NLRI']:
-            self._next_hop = attr['value']['next_hop']
-            if self._type != 'BGP4MP':
-                return
-            for nlri in attr['value']['nlri']:
-                self._nlri.append('%s/%d' % (nlri['prefix'], nlri['length']))
-        elif attr_t == BGP_ATTR_T['MP_UNREACH_NLRI']:
-            if self._type != 'BGP4MP':
-                return
-            for withdrawn in attr['value']['withdrawn_routes']:
-                self._withdrawn.append('%s/%d' % (withdrawn['prefix'], withdrawn['length']))
-        elif attr_t == BGP_ATTR_T['AS4_PATH']:
-            self._as4_path = []
-            for seg in attr['value']:
-                seg_t = list(seg['type'])[0]
-                if seg_t == AS_PATH_SEG_T['AS_SET']:
-                    self._as4_path.append('{%s}' % ','.join(seg['value']))
-                elif seg_t == AS_PATH_SEG_T['AS_CONFED_SEQUENCE']:
-                    self._as4_path.append('(' + seg['value'][0])
-                    self._as4_path += seg['value'][1:-1]
-                    self._as4_path.append(seg['value'][-1] + ')')
-                elif seg_t == AS_PATH_SEG_T['AS_CONFED_SET']:
-                    self._as4_path.append('[%s]' % ','.join(seg['value']))
-                else:
-                    self._as4_path += seg['value']
+        # Attributes without a handler (origin, MED, communities...) are skipped after a single dict lookup
+        handler = self._ATTR_HANDLERS.get(next(iter(attr['type'])))
+        if handler is not None:
+            handler(self, attr)
+
+    def _attr_next_hop(self, attr) -> None:
+        """
+        Handle the NEXT_HOP attribute.
+
+        :param attr: Path attribute data.
+        :return: None
+        """
+
+        self._next_hop.append(attr['value'])
+
+    def _attr_as_path(self, attr) -> None:
+        """
+        Handle the AS_PATH attribute.
+
+        :param attr: Path attribute data.
+        :return: None
+        """
+
+        self._parse_as_segments(attr['value'], self._as_path)
+
+    def _attr_mp_reach_nlri(self, attr) -> None:
+        """
+        Handle the MP_REACH_NLRI attribute.
+
+        :param attr: Path attribute data.
+        :return: None
+        """
+
+        self._next_hop[:] = attr['value']['next_hop']
+        if self._type != 'BGP4MP':
+            return
+        for nlri in attr['value']['nlri']:
+            self._nlri.append(f"{nlri['prefix']}/{nlri['length']}")
+
+    def _attr_mp_unreach_nlri(self, attr) -> None:
+        """
+        Handle the MP_UNREACH_NLRI attribute.
+
+        :param attr: Path attribute data.
+        :return: None
+        """
+
+        if self._type != 'BGP4MP':
+            return
+        for withdrawn in attr['value']['withdrawn_routes']:
+            self._withdrawn.append(f"{withdrawn['prefix']}/{withdrawn['length']}")
+
+    def _attr_as4_path(self, attr) -> None:
+        """
+        Handle the AS4_PATH attribute.
+
+        :param attr: Path attribute data.
+        :return: None
+        """
+
+        self._parse_as_segments(attr['value'], self._as4_path)
+
+    @staticmethod
+    def _parse_as_segments(segments: list, path: list[str]) -> None:
+        """
+        Rebuild a path buffer from the segments of an AS_PATH or AS4_PATH attribute. AS sets and confederation segments
+        are kept as bracketed tokens.
+
+        :param segments: Decoded path segments of the attribute.
+        :param path: Path buffer to refill, cleared first.
+        :return: None
+        """
+
+        path.clear()
+        for seg in segments:
+            seg_t = next(iter(seg['type']))
+            value = seg['value']
+            if seg_t == _AS_SET:
+                path.append('{%s}' % ','.join(value))
+            elif seg_t == _AS_CONFED_SEQUENCE:
+                path.append('(' + value[0])
+                path += value[1:-1]
+                path.append(value[-1] + ')')
+            elif seg_t == _AS_CONFED_SET:
+                path.append('[%s]' % ','.join(value))
+            else:
+                path += value
+
+    _ATTR_HANDLERS = {
+        BGP_ATTR_T['NEXT_HOP']: _attr_next_hop,
+        BGP_ATTR_T['AS_PATH']: _attr_as_path,
+        BGP_ATTR_T['MP_REACH_NLRI']: _attr_mp_reach_nlri,
+        BGP_ATTR_T['MP_UNREACH_NLRI']: _attr_mp_unreach_nlri,
+        BGP_ATTR_T['AS4_PATH']: _attr_as4_path,
+    }
 
-    def _merge_as_path(self) -> str:
+    def _merge_as_path(self) -> list[str]:
         """
         Merge AS paths, including AS4 paths if available.
 
-        :return: Merged AS path as a string.
+        :return: Merged AS path as a list of path segments. Without an AS4 path this is the AS path buffer itself, so
+            it must not be kept past the current route.
         """
 
         if len(self._as4_path):
             n = len(self._as_path) - len(self._as4_path)
-            return ' '.join(self._as_path[:n] + self._as4_path)
+            return self._as_path[:n] + self._as4_path
         else:
-            return ' '.join(self._as_path)
+            return self._as_path
@@ -27,7 +27,18 @@ class Paths:
     PRED_DIR = REL_ROOT / "predict"
 
 
+# Collected once at import, parents are created as needed so the order of the attributes doesn't matter
+_ALL_PATHS = tuple(value for value in vars(Paths).values() if isinstance(value, Path))
+
+_structure_ensured = False
+
+
 def ensure_project_structure():
-    for value in Paths.__dict__.values():
-        if isinstance(value, Path):
-            value.mkdir(exist_ok=True)
+    global _structure_ensured
+    if _structure_ensured:
+        return
+
+    for path in _ALL_PATHS:
+        path.mkdir(parents=True, exist_ok=True)
+
+    _structure_ensured = True
@@ -0,0 +1,25 @@
+from datetime import datetime
+from math import inf
+from typing import Iterable
+
+from frozendict import frozendict
+
+from bgp_anomaly_detection import SnapShot
+from bgp_anomaly_detection.autonomous_system import AS
+
+
+def make_snapshot(timestamp: datetime, as_instances: Iterable[AS]) -> SnapShot:
+    """
+    Builds a SnapShot around in-memory AS instances, skipping the file import.
+
+    :param timestamp: Snapshot time, also used to order the snapshots in training.
+    :param as_instances: AS instances of the snapshot.
+    :return: The snapshot.
+    """
+
+    snapshot = SnapShot.__new__(SnapShot)
+    object.__setattr__(snapshot, "file_path", f"rib.{timestamp:%Y%m%d.%H%M}.json")
+    object.__setattr__(snapshot, "timestamp", timestamp)
+    object.__setattr__(snapshot, "as_map", frozendict((as_instance.id, as_instance) for as_instance in as_instances))
+    object.__setattr__(snapshot, "msg_limit", inf)
+    return snapshot
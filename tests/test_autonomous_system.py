@@ -1,9 +1,22 @@
 import unittest
 from dataclasses import FrozenInstanceError
+from pickle import dumps, loads
 
 from bgp_anomaly_detection.autonomous_system import AS
 
 
+class _LegacyAS:
+    """
+    Pickles the way an AS did before the derived slots were added: only the seven declared fields as state.
+    """
+
+    def __init__(self, as_data: dict) -> None:
+        self.state = list(as_data.values())
+
+    def __reduce__(self):
+        return object.__new__, (AS,), self.state
+
+
 class TestAS(unittest.TestCase):
     def setUp(self):
         self.as_data = {
@@ -30,6 +43,14 @@ class TestAS(unittest.TestCase):
         with self.assertRaises(ValueError):
             AS(**{**self.as_data, 'id': 'invalid_id'})
 
+    def test_id_normalization(self):
+        self.assertEqual(AS(**{**self.as_data, 'id': '012345'}).id, '12345')
+        self.assertEqual(AS(**{**self.as_data, 'id': ' 12345 '}).id, '12345')
+        self.assertEqual(AS(**{**self.as_data, 'id': 12345}).id, '12345')
+        self.assertEqual(AS(**{**self.as_data, 'id': '0'}).id, '0')
+        with self.assertRaises(ValueError):
+            AS(**{**self.as_data, 'id': ''})
+
     def test_post_init(self):
         self.assertEqual(self.as_instance.id, '12345')
         with self.assertRaises(FrozenInstanceError):
@@ -58,6 +79,32 @@ class TestAS(unittest.TestCase):
     def test_ipv6_count(self):
         self.assertEqual(self.as_instance.ipv6_count, 1)
 
+    def test_ip_counts_without_prefixes(self):
+        empty_instance = AS(**{**self.as_data, 'announced_prefixes': frozenset()})
+        self.assertEqual(empty_instance.ipv4_count, 0)
+        self.assertEqual(empty_instance.ipv6_count, 0)
+
+    def test_pickle_round_trip(self):
+        restored = loads(dumps(self.as_instance))
+        self.assertEqual(restored.ipv4_count, 1)
+        self.assertEqual(restored.ipv6_count, 1)
+        self.assertAlmostEqual(restored.mean_path_size, 2.4)
+
+    def test_unpickle_without_derived_slots(self):
+        restored = loads(dumps(_LegacyAS(self.as_data)))
+        self.assertIsInstance(restored, AS)
+        self.assertEqual(restored.announced_prefixes, self.as_data['announced_prefixes'])
+        self.assertEqual(restored.ipv4_count, 1)
+        self.assertEqual(restored.ipv6_count, 1)
+        self.assertAlmostEqual(restored.mean_path_size, 2.4)
+        self.assertEqual(str(restored), str(self.as_instance))
+
+    def test_get_property_names(self):
+        property_names = AS.get_property_names()
+        self.assertIn('ipv4_count', property_names)
+        self.assertIn('ipv6_count', property_names)
+        self.assertFalse(any(name.startswith('_') for name in property_names))
+
     def test_total_prefixes(self):
         self.assertEqual(self.as_instance.total_prefixes, 2)
 
@@ -72,17 +119,17 @@ class TestAS(unittest.TestCase):
                 "mid_path_count": 10,
                 "end_path_count": 5,
                 "mean_path_size": 2.4,
-                "path_sizes": ((3, 2), (2, 3))
+                "path_sizes": frozenset({(3, 2), (2, 3)})
             },
             "prefix": {
                 "total_prefixes": 2,
                 "ipv4_count": 1,
                 "ipv6_count": 1,
-                "announced_prefixes": ('192.0.2.0/24', '2001:db8::/32')
+                "announced_prefixes": frozenset({'192.0.2.0/24', '2001:db8::/32'})
             },
             "neighbour": {
                 "total_neighbours": 2,
-                "neighbours": ('12346', '12347')
+                "neighbours": frozenset({'12346', '12347'})
             }
         }
         self.assertEqual(self.as_instance.export_json(), expected_json)
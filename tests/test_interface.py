@@ -0,0 +1,147 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from multiprocessing import get_start_method
+from pathlib import Path
+from pickle import dump
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from frozendict import frozendict
+
+from bgp_anomaly_detection.interface import load_snapshots
+
+
+def bz2_messages(as_id: str) -> list[SimpleNamespace]:
+    """
+    Stub mrtparse messages for a dump with a single peer announcing one route through the given AS.
+    """
+
+    return [
+        SimpleNamespace(err=None, data={
+            "type": {13: "TABLE_DUMP_V2"}, "subtype": {1: "PEER_INDEX_TABLE"}, "timestamp": {1704182400: ""},
+            "peer_entries": [{"peer_ip": "192.0.2.1", "peer_as": "64500"}]
+        }),
+        SimpleNamespace(err=None, data={
+            "type": {13: "TABLE_DUMP_V2"}, "subtype": {2: "RIB"}, "timestamp": {1704182400: ""},
+            "prefix": "198.51.100.0", "length": 24,
+            "rib_entries": [{"peer_index": 0, "path_attributes": [
+                {"type": {2: "AS_PATH"}, "value": [{"type": {2: ""}, "value": ["64500", as_id]}]},
+                {"type": {3: "NEXT_HOP"}, "value": "192.0.2.1"}
+            ]}]
+        }),
+    ]
+
+
+class TestLoadSnapshots(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = Path(temp_dir.name)
+
+        # An empty location table keeps the parsers away from the package data directory
+        deleg_dir = self.temp_dir / "delegated"
+        deleg_dir.mkdir()
+        with open(deleg_dir / "locale.pkl", "wb") as file:
+            dump(frozendict(), file)
+        deleg_patch = patch("bgp_anomaly_detection.paths.Paths.DELEG_DIR", deleg_dir)
+        deleg_patch.start()
+        self.addCleanup(deleg_patch.stop)
+
+    def write_json(self, name: str, as_id: str) -> Path:
+        file_path = self.temp_dir / name
+        file_path.write_text(
+            '{"snapshot_time": "", "as": {"as_total": 1, "as_info": {"%s": {"location": "US", "path": {'
+            '"mid_path_count": 1, "end_path_count": 2, "path_sizes": [[3, 1]]}, "prefix": {"announced_prefixes": '
+            '["192.0.2.0/24"]}, "neighbour": {"neighbours": []}}}}}' % as_id
+        )
+        return file_path
+
+    def write_csv(self, name: str, as_id: str) -> Path:
+        file_path = self.temp_dir / name
+        file_path.write_text(
+            'as_id,location,mid_path_count,end_path_count,path_sizes,announced_prefixes,neighbours\n'
+            f'{as_id},BR,2,0,"{{""2"": 4}}",198.51.100.0/24,64500\n'
+        )
+        return file_path
+
+    def test_keeps_input_order(self):
+        # Written out of timestamp order, the result must follow the argument order rather than sort
+        file_paths = [
+            self.write_json("rib.20240103.0000.json", "64503"),
+            self.write_csv("rib.20240101.0000.csv", "64501"),
+            self.write_json("rib.20240102.0000.json", "64502"),
+        ]
+
+        snapshots = load_snapshots(file_paths, max_workers=3)
+
+        self.assertEqual([str(snapshot) for snapshot in snapshots], [file_path.name for file_path in file_paths])
+        self.assertEqual(
+            [snapshot.timestamp for snapshot in snapshots],
+            [datetime(2024, 1, 3), datetime(2024, 1, 1), datetime(2024, 1, 2)]
+        )
+        self.assertEqual([list(snapshot.as_map) for snapshot in snapshots], [["64503"], ["64501"], ["64502"]])
+
+    def test_mixed_json_and_csv(self):
+        snapshots = load_snapshots([
+            self.write_csv("rib.20240101.0000.csv", "64501"),
+            self.write_json("rib.20240102.0000.json", "64502"),
+        ])
+
+        csv_as, json_as = snapshots[0].as_map["64501"], snapshots[1].as_map["64502"]
+        self.assertEqual(
+            (csv_as.location, csv_as.mid_path_count, csv_as.path_sizes, csv_as.neighbours),
+            ("BR", 2, frozenset({(2, 4)}), frozenset({"64500"}))
+        )
+        self.assertEqual(
+            (json_as.location, json_as.end_path_count, json_as.path_sizes, json_as.announced_prefixes),
+            ("US", 2, frozenset({(3, 1)}), frozenset({"192.0.2.0/24"}))
+        )
+
+    def test_max_workers_passed_through(self):
+        file_paths = [self.write_json("rib.20240102.0000.json", "64502")]
+
+        with patch("bgp_anomaly_detection.interface.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as executor:
+            executor.__name__ = ThreadPoolExecutor.__name__
+            load_snapshots(file_paths, max_workers=5)
+            executor.assert_called_once_with(max_workers=5)
+
+            executor.reset_mock()
+            load_snapshots(file_paths)
+            self.assertGreaterEqual(executor.call_args.kwargs["max_workers"], 1)
+
+    def test_executor_choice(self):
+        json_path = self.write_json("rib.20240102.0000.json", "64502")
+        bz2_path = self.temp_dir / "rib.20240102.0800.bz2"
+
+        # Both pools are stood in for by threads, only the choice between them is under test here
+        with patch("bgp_anomaly_detection.interface.ProcessPoolExecutor", wraps=ThreadPoolExecutor) as processes, \
+                patch("bgp_anomaly_detection.interface.ThreadPoolExecutor", wraps=ThreadPoolExecutor) as threads, \
+                patch("bgp_anomaly_detection.mrt_file.Reader", side_effect=lambda _: iter(bz2_messages("64501"))):
+            processes.__name__ = ProcessPoolExecutor.__name__
+            threads.__name__ = ThreadPoolExecutor.__name__
+
+            load_snapshots([json_path])
+            processes.assert_not_called()
+            threads.assert_called_once()
+
+            threads.reset_mock()
+            load_snapshots([json_path, bz2_path])
+            processes.assert_called_once()
+            threads.assert_not_called()
+
+    @unittest.skipUnless(get_start_method() == "fork", "the patched Reader only reaches forked workers")
+    def test_bz2_in_processes(self):
+        file_paths = [self.temp_dir / "rib.20240102.0800.bz2", self.write_json("rib.20240102.1000.json", "64502")]
+
+        with patch("bgp_anomaly_detection.mrt_file.Reader", side_effect=lambda _: iter(bz2_messages("64501"))):
+            snapshots = load_snapshots(file_paths, max_workers=2)
+
+        # The parsed dump comes back from its worker process through a pickle
+        self.assertEqual([str(snapshot) for snapshot in snapshots], [file_path.name for file_path in file_paths])
+        self.assertEqual(snapshots[0].timestamp, datetime(2024, 1, 2, 8))
+        self.assertEqual(snapshots[0].as_map["64501"].announced_prefixes, frozenset({"198.51.100.0/24"}))
+        self.assertEqual(snapshots[0].as_map["64500"].neighbours, frozenset({"64501"}))
+        self.assertEqual(list(snapshots[1].as_map), ["64502"])
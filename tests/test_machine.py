@@ -1,12 +1,117 @@
 from collections import Counter
 from csv import DictReader, DictWriter
+from datetime import datetime
 from json import loads
 from pathlib import Path
 from pickle import load
+from statistics import NormalDist
 from tempfile import TemporaryDirectory
 from unittest import TestCase
+from unittest.mock import patch
+
+import numpy as np
 
 from bgp_anomaly_detection import Machine, SnapShot
+from bgp_anomaly_detection.autonomous_system import AS
+from bgp_anomaly_detection.machine import _property_stats
+from conftest import make_snapshot
+
+
+def reference_stats(history: list[float]) -> tuple[float, ...]:
+    """
+    Training statistics of one property history, computed one AS at a time the way training originally did.
+
+    :param history: Property history of one AS.
+    :return: Tuple with the range minimum, range maximum, mean, standard deviation, skewness and slope.
+    """
+
+    history = np.array(history, dtype=np.float64)
+    st_qt = np.percentile(history, 25)
+    rd_qt = np.percentile(history, 75)
+    dq = rd_qt - st_qt
+    min_ = max(history.min(), st_qt - (1.5 * dq))
+    max_ = min(history.max(), rd_qt + (1.5 * dq))
+    mean = history.mean()
+    std_d = np.std(history)
+    if std_d > 0:
+        centered = history - mean
+        skewness = (centered ** 3).mean() / (centered ** 2).mean() ** 1.5
+        slope, _ = np.polyfit(np.arange(history.size), history, 1)
+    else:
+        skewness = slope = 0.0
+    return min_, max_, mean, std_d, skewness, slope
+
+
+def assert_stats_close(stats, expected) -> None:
+    np.testing.assert_allclose(np.asarray(stats, dtype=np.float64), expected, rtol=1e-9, atol=1e-9)
+
+
+class TestPropertyStats(TestCase):
+
+    def test_matches_reference(self):
+        rng = np.random.default_rng(7)
+        history = np.vstack((
+            rng.integers(0, 50, size=(20, 6)).astype(np.float64),
+            rng.normal(10, 3, size=(5, 6)),
+            np.full((1, 6), 4.0),
+            [[0, 0, 0, 0, 0, 100]]
+        ))
+
+        stats = _property_stats(history)
+
+        for row in range(history.shape[0]):
+            assert_stats_close([stat[row] for stat in stats], reference_stats(history[row]))
+
+    def test_constant_history(self):
+        stats = _property_stats(np.full((2, 4), 7.0))
+
+        for row in range(2):
+            assert_stats_close([stat[row] for stat in stats], (7, 7, 7, 0, 0, 0))
+
+    def test_single_element_history(self):
+        stats = _property_stats(np.array([[3.0], [9.0]]))
+
+        assert_stats_close([stat[0] for stat in stats], (3, 3, 3, 0, 0, 0))
+        assert_stats_close([stat[1] for stat in stats], (9, 9, 9, 0, 0, 0))
+
+
+class TestMachineTrainStats(TestCase):
+
+    def test_ragged_histories(self):
+        # AS 1 is in every snapshot, AS 2 misses two of them, AS 3 is only seen once and AS 4 never changes
+        snapshot_ases = (
+            [("1", 3, 1, {(2, 1)}), ("2", 1, 4, {(3, 4)}), ("4", 2, 2, {(1, 2)})],
+            [("1", 8, 2, {(2, 2), (5, 1)}), ("4", 2, 2, {(1, 2)})],
+            [("1", 1, 6, set()), ("2", 7, 0, {(4, 1)}), ("4", 2, 2, {(1, 2)})],
+            [("1", 12, 3, {(3, 3)}), ("3", 5, 5, {(6, 2)}), ("4", 2, 2, {(1, 2)})],
+        )
+        snapshots = list()
+        histories = dict()
+        for day, as_rows in enumerate(snapshot_ases, start=1):
+            as_instances = list()
+            for as_id, mid_path_count, end_path_count, path_sizes in as_rows:
+                prefixes = frozenset(f"10.{day}.{n}.0/24" for n in range(mid_path_count % 4))
+                as_instance = AS(as_id, "US", mid_path_count, end_path_count, frozenset(path_sizes), prefixes,
+                                 frozenset({"64500"}))
+                as_instances.append(as_instance)
+                histories.setdefault(as_id, list()).append(as_instance)
+            snapshots.append(make_snapshot(datetime(2024, 1, day), as_instances))
+
+        machine = Machine()
+        machine.train(reversed(snapshots))
+
+        self.assertEqual(machine.train_data.keys(), histories.keys())
+        for as_id, as_history in histories.items():
+            stats = machine.train_data[as_id]["stats"]
+            self.assertEqual(tuple(stats), AS.get_property_names())
+            self.assertEqual(stats["location"][6], "US")
+            for prty in AS.get_property_names():
+                if prty == "location":
+                    continue
+                with self.subTest(as_id=as_id, property=prty):
+                    expected = reference_stats([getattr(as_instance, prty) for as_instance in as_history])
+                    assert_stats_close(stats[prty][:6], expected)
+                    self.assertEqual(stats[prty][6], "")
 
 
 class TestMachine(TestCase):
@@ -150,3 +255,83 @@ class TestMachine(TestCase):
 
             self.assertEqual(self.machine.known_as.keys(), loaded_machine._as_map.keys(), "Loaded known_as differs")
             self.assertEqual(self.machine.dataset, loaded_machine.dataset, "Loaded dataset differs")
+
+
+class TestMachinePredict(TestCase):
+
+    def setUp(self):
+        # Known ASes drift across the training snapshots so predictions mix warning levels and behaviours
+        training = list()
+        for day in range(1, 6):
+            training.append(make_snapshot(datetime(2024, 1, day), [
+                AS("1", "US", day, 2, frozenset({(2, day)}), frozenset({f"10.{day}.0.0/24"}), frozenset({"2"})),
+                AS("2", "BR", 10 - day, day % 3, frozenset({(3, 1)}), frozenset({"10.0.0.0/24", "2001:db8::/32"}),
+                   frozenset({"1", "3"})),
+                AS("3", "DE", 4, 4, frozenset(), frozenset(), frozenset({"2"})),
+            ]))
+        self.machine = Machine()
+        self.machine.train(training)
+
+        # ASes 7 and 9 have no training data and sit between the known ones
+        self.snapshot = make_snapshot(datetime(2024, 1, 6), [
+            AS("7", "US", 1, 1, frozenset(), frozenset(), frozenset()),
+            AS("2", "BR", 40, 0, frozenset({(3, 1)}), frozenset({"10.0.0.0/24"}), frozenset({"1"})),
+            AS("9", "FR", 2, 3, frozenset(), frozenset(), frozenset()),
+            AS("1", "CA", 6, 2, frozenset({(2, 6)}), frozenset({"10.6.0.0/24"}), frozenset({"2"})),
+            AS("3", "DE", 4, 4, frozenset(), frozenset(), frozenset({"2"})),
+        ])
+
+    def reference_prediction(self, as_instance: AS) -> dict[str, dict[str, int]]:
+        stats = self.machine.train_data[as_instance.id]["stats"]
+        prediction = dict()
+        for prty in AS.get_property_names():
+            min_, max_, mean, std_d, _, slope, location = stats[prty]
+            if prty == "location":
+                prediction[prty] = {"warning_level": 2 if as_instance.location != location else 0, "behaviour": 0}
+                continue
+            value = getattr(as_instance, prty)
+            warning_level = int(value < min_ or value > max_)
+            if std_d > 0 and not 0.05 <= NormalDist().cdf((value - mean) / std_d) <= 0.95:
+                warning_level += 2
+            behaviour = 1 if slope > 0.2 else -1 if slope < -0.2 else 0
+            prediction[prty] = {"warning_level": warning_level, "behaviour": behaviour}
+        return prediction
+
+    def test_predict(self):
+        predictions = self.machine.predict(self.snapshot, save=False)
+
+        self.assertEqual(list(predictions), ["7", "2", "9", "1", "3"])
+        self.assertIsNone(predictions["7"])
+        self.assertIsNone(predictions["9"])
+        for as_id in ("1", "2", "3"):
+            self.assertEqual(predictions[as_id], self.reference_prediction(self.snapshot.as_map[as_id]))
+        self.assertEqual(predictions["1"]["location"]["warning_level"], 2)
+        self.assertEqual(predictions["1"]["mid_path_count"]["behaviour"], 1)
+
+    def test_save_predictions(self):
+        with TemporaryDirectory() as tempdir, patch("bgp_anomaly_detection.machine.Paths.PRED_DIR", Path(tempdir)):
+            predictions = self.machine.predict(self.snapshot, save=True)
+            save_dir = Path(tempdir, "20240106.0000_01")
+
+            with open(save_dir / "as_warning_level", newline="") as csvfile:
+                rows = list(DictReader(csvfile))
+            self.assertEqual([row["AS_ID"] for row in rows], ["2", "1", "3"])
+            for row in rows:
+                expected = sum(prediction["warning_level"] for prediction in predictions[row["AS_ID"]].values())
+                self.assertEqual(int(row["Warning_Level"]), expected)
+
+            for prty in AS.get_property_names():
+                with open(save_dir / prty, newline="") as csvfile:
+                    rows = list(DictReader(csvfile))
+                self.assertEqual([row["AS_ID"] for row in rows], list(predictions))
+                for row in rows:
+                    as_predictions = predictions[row["AS_ID"]]
+                    if as_predictions is None:
+                        self.assertEqual((row["Warning_Level"], row["Behaviour"]), ("", ""))
+                    else:
+                        self.assertEqual(
+                            (int(row["Warning_Level"]), int(row["Behaviour"])),
+                            (as_predictions[prty]["warning_level"], as_predictions[prty]["behaviour"])
+                        )
+
+            self.assertTrue((save_dir / "predict.xlsx").exists())
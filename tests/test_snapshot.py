@@ -1,12 +1,18 @@
 import unittest
+from dataclasses import astuple
 from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
 from unittest.mock import patch, mock_open, MagicMock
 
 from frozendict import frozendict
+from orjson import OPT_INDENT_2, dumps as orjson_dumps
 
 from bgp_anomaly_detection import SnapShot
 from bgp_anomaly_detection.autonomous_system import AS
 from bgp_anomaly_detection.mrt_file import MRTParser
+from conftest import make_snapshot
 
 
 class TestSnapShot(unittest.TestCase):
@@ -47,6 +53,21 @@ class TestSnapShot(unittest.TestCase):
         self.assertEqual(snapshot.as_map,
                          frozendict({"1111": AS("1111", "US", 1, 2, frozenset(), frozenset(), frozenset())}))
 
+    def test_hash_matches_equality(self):
+        json_data = '{"snapshot_time": "16/07/2023 12:00", "as": {"as_total": 0, "as_info": {}}}'
+        with TemporaryDirectory() as first_dir, TemporaryDirectory() as second_dir:
+            first_path = Path(first_dir, "rib.20230716.1200.json")
+            second_path = Path(second_dir, "rib.20230716.1200.json")
+            first_path.write_text(json_data)
+            second_path.write_text(json_data)
+
+            first_snapshot = SnapShot(str(first_path))
+            second_snapshot = SnapShot(str(second_path))
+
+        self.assertEqual(first_snapshot, second_snapshot)
+        self.assertEqual(hash(first_snapshot), hash(second_snapshot))
+        self.assertEqual(len({first_snapshot, second_snapshot}), 1)
+
     @patch('pathlib.Path')
     def test_export_csv(self, mock_path):
         mock_path.return_value.__truediv__.return_value = mock_path.return_value
@@ -60,7 +81,7 @@ class TestSnapShot(unittest.TestCase):
         with patch('builtins.open', new_callable=mock_open) as mock_file:
             snapshot.export_csv(destination_dir=".")
 
-            mock_file.assert_called_once_with(mock_path.return_value, mode="w", newline="")
+            mock_file.assert_called_once_with(mock_path.return_value, mode="w", newline="", buffering=1 << 20)
             handle = mock_file()
             handle.write.assert_called()  # Ensure some writing happened
 
@@ -77,10 +98,40 @@ class TestSnapShot(unittest.TestCase):
         with patch('builtins.open', new_callable=mock_open) as mock_file:
             snapshot.export_json(destination_dir=".")
 
-            mock_file.assert_called_once_with(mock_path.return_value, "w")
+            mock_file.assert_called_once_with(mock_path.return_value, "wb", buffering=1 << 20)
             handle = mock_file()
             handle.write.assert_called()  # Ensure some writing happened
 
+    def test_export_json_round_trip(self):
+        as_instances = (
+            AS("64500", "US", 3, 2, frozenset({(2, 1), (4, 3)}), frozenset({"192.0.2.0/24", "2001:db8::/32"}),
+               frozenset({"64501", "64502"})),
+            AS("64501", "BR", 0, 1, frozenset({(1, 1)}), frozenset(), frozenset({"64500"})),
+            AS("64502", "ZZ", 5, 0, frozenset(), frozenset({"198.51.100.0/24"}), frozenset()),
+        )
+        for snapshot_instances in (as_instances, ()):
+            with self.subTest(as_total=len(snapshot_instances)), TemporaryDirectory() as tempdir:
+                snapshot = make_snapshot(datetime(2024, 1, 2, 8, 0), snapshot_instances)
+                as_map = snapshot.as_map
+
+                snapshot.export_json(destination_dir=tempdir)
+
+                json_path = Path(tempdir, "rib.20240102.0800.json")
+                document = {
+                    "snapshot_time": "02/01/2024 08:00",
+                    "as": {
+                        "as_total": len(as_map),
+                        "as_info": {as_id: as_instance.export_json() for as_id, as_instance in as_map.items()}
+                    }
+                }
+                self.assertEqual(json_path.read_bytes(), orjson_dumps(document, default=list, option=OPT_INDENT_2))
+
+                reloaded = SnapShot(str(json_path))
+                self.assertEqual(reloaded.timestamp, snapshot.timestamp)
+                self.assertEqual(list(reloaded.as_map), list(as_map))
+                for as_id, as_instance in as_map.items():
+                    self.assertEqual(astuple(reloaded.as_map[as_id]), astuple(as_instance))
+
     @patch('pathlib.Path')
     def test_export_pickle(self, mock_path):
         mock_path.return_value.__truediv__.return_value = mock_path.return_value
@@ -94,7 +145,7 @@ class TestSnapShot(unittest.TestCase):
         with patch('builtins.open', new_callable=mock_open) as mock_file:
             snapshot.export_pickle(destination_dir=".")
 
-            mock_file.assert_called_once_with(mock_path.return_value, "wb")
+            mock_file.assert_called_once_with(mock_path.return_value, "wb", buffering=1 << 20)
             handle = mock_file()
             handle.write.assert_called()  # Ensure some writing happened
 
@@ -115,6 +166,51 @@ class TestMRTParser(unittest.TestCase):
         self.assertIsInstance(result, frozendict)
         self.assertTrue(mock_file.called)
 
+    def test_import_bz2_dump_file(self):
+        def rib(subtype: int, prefix: str, length: int, path_attributes: list) -> SimpleNamespace:
+            return SimpleNamespace(err=None, data={
+                "type": {13: "TABLE_DUMP_V2"}, "subtype": {subtype: "RIB"}, "timestamp": {1704182400: ""},
+                "prefix": prefix, "length": length,
+                "rib_entries": [{"peer_index": 0, "path_attributes": path_attributes}]
+            })
+
+        def as_path(*segments: tuple[int, list[str]]) -> dict:
+            return {
+                "type": {2: "AS_PATH"},
+                "value": [{"type": {seg_t: ""}, "value": value} for seg_t, value in segments]
+            }
+
+        messages = [
+            SimpleNamespace(err=None, data={
+                "type": {13: "TABLE_DUMP_V2"}, "subtype": {1: "PEER_INDEX_TABLE"}, "timestamp": {1704182400: ""},
+                "peer_entries": [{"peer_ip": "192.0.2.1", "peer_as": "64500"}]
+            }),
+            rib(2, "198.51.100.0", 24, [
+                as_path((2, ["64500", "64501"])),
+                {"type": {3: "NEXT_HOP"}, "value": "192.0.2.1"}
+            ]),
+            rib(4, "2001:db8::", 32, [
+                as_path((2, ["64500"]), (1, ["64502", "64503"])),
+                {"type": {14: "MP_REACH_NLRI"}, "value": {"next_hop": ["2001:db8::1"]}}
+            ]),
+            # A route without a next hop is neither counted nor dumped
+            rib(2, "203.0.113.0", 24, [as_path((2, ["64500", "64504"]))]),
+        ]
+
+        with TemporaryDirectory() as tempdir, \
+                patch('bgp_anomaly_detection.mrt_file.Reader', return_value=iter(messages)), \
+                patch('bgp_anomaly_detection.mrt_file.Paths.DELEG_DIR', Path(tempdir)), \
+                patch('bgp_anomaly_detection.mrt_file.make_location_dictionary', return_value=frozendict()):
+            dump_path = Path(tempdir, "dump.txt")
+            snapshot = SnapShot(str(Path(tempdir, "rib.20240102.0800.bz2")), dump_file=dump_path)
+
+            self.assertEqual(dump_path.read_text().splitlines(), [
+                "TABLE_DUMP2|1704182400|B|192.0.2.1|64500|198.51.100.0/24|64500 64501",
+                "TABLE_DUMP2|1704182400|B|192.0.2.1|64500|2001:db8::/32|64500 {64502,64503}",
+            ])
+        self.assertEqual(snapshot.as_map["64501"].announced_prefixes, frozenset({"198.51.100.0/24"}))
+        self.assertNotIn("64504", snapshot.as_map)
+
     @patch('builtins.open', new_callable=mock_open,
            read_data='{"as": {"as_total": 1, "as_info": {"1111": {"location": "US", "path": {"mid_path_count": 1, '
                      '"end_path_count": 2, "path_sizes": []}, "prefix": {"announced_prefixes": []}, "neighbour": {'